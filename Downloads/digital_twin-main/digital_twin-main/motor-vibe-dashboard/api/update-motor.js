@@ -22,8 +22,7 @@ function getAdmin() {
 }
 
 function generateLogEntry() {
-  const now = new Date();
-  const ts = now.toISOString().slice(0, 19).replace("T", " ");
+  const ts = Math.floor(Date.now() / 1000); // unix seconds
   const r = (min, max) => Math.round((min + Math.random() * (max - min)) * 100) / 100;
   return {
     I1: r(60, 95),
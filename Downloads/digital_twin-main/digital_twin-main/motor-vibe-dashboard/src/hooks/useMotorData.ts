@@ -176,7 +176,7 @@ export function useMotorData() {
         temperature?: { T1?: number; T2?: number };
         frequency?: number;
         vibration?: number;
-        timestamp?: string;
+        timestamp?: number;
       };
       setMotorData({
         current: {
@@ -54,5 +54,5 @@ export interface FirebaseLogEntry {
   T1: number;
   T2: number;
   vibration: number;
-  timestamp: string;
+  timestamp: number; // unix seconds
 }
@@ -0,0 +1,27 @@
+"""
+Shared Firebase credential lookup for the motor_backend scripts.
+Resolved once per process (cached), so importing several scripts only probes the disk once.
+"""
+import functools
+import glob
+import os
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Known filenames for the service account key, checked in order
+CRED_PATHS = [
+    os.path.join(SCRIPT_DIR, "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
+    os.path.join(SCRIPT_DIR, "motor-f8005-firebase-adminsdk-fbsvc-b789b512df.json"),
+    os.path.join(os.path.dirname(SCRIPT_DIR), "motor_backend", "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
+    os.path.join(os.getcwd(), "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def find_cred_path():
+    """Return the first service account JSON found, or None."""
+    path = next((p for p in CRED_PATHS if os.path.exists(p)), None)
+    # If you renamed the key file, we look for any *firebase*adminsdk*.json in motor_backend
+    if path is None:
+        path = next(glob.iglob(os.path.join(glob.escape(SCRIPT_DIR), "*firebase*adminsdk*.json")), None)
+    return path
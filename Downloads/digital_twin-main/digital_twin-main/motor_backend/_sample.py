@@ -0,0 +1,37 @@
+"""
+Motor reading schema shared by the motor_backend scripts.
+Readings stay as Sample tuples in-process and become dicts only at the JSON boundary.
+"""
+from typing import NamedTuple
+
+
+class Sample(NamedTuple):
+    """One motor reading, as stored in motor01/logs/entry_XXX."""
+    I1: float
+    I2: float
+    I3: float
+    V1: float
+    V2: float
+    V3: float
+    frequency: float
+    pf: float
+    T1: float
+    T2: float
+    vibration: float
+    timestamp: int  # unix seconds
+
+
+# Numeric signal fields, in Sample order (everything except timestamp)
+FIELDS = Sample._fields[:-1]
+
+
+def live_reading(s: Sample) -> dict:
+    """motor01/live_reading payload (latest values for real-time dashboard)."""
+    return {
+        "current": {"I1": s.I1, "I2": s.I2, "I3": s.I3},
+        "voltage": {"V1": s.V1, "V2": s.V2, "V3": s.V3},
+        "temperature": {"T1": s.T1, "T2": s.T2},
+        "frequency": s.frequency,
+        "vibration": s.vibration,
+        "timestamp": s.timestamp,
+    }
@@ -85,7 +85,7 @@ for i in range(1, 361):
         "T1": round(random.uniform(45, 75), 2),
         "T2": round(random.uniform(40, 65), 2),
         "vibration": round(random.uniform(1.2, 4.5), 2),
-        "timestamp": (start_time + timedelta(seconds=i * 10)).strftime("%Y-%m-%d %H:%M:%S")
+        "timestamp": int((start_time + timedelta(seconds=i * 10)).timestamp())
     }
 
     # pad number like entry_001, entry_002, ...
@@ -0,0 +1,79 @@
+"""
+Shared Firebase app for the motor_backend scripts.
+Initialized lazily, once per process: every caller shares one credential (one token refresh)
+and one keep-alive socket pool, even when several scripts run in the same process.
+"""
+import functools
+import os
+from datetime import datetime, timedelta, timezone
+
+import firebase_admin
+from firebase_admin import credentials, db
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _creds import CRED_PATHS, find_cred_path
+
+DATABASE_URL = "https://motor-f8005-default-rtdb.asia-southeast1.firebasedatabase.app"
+STORAGE_BUCKET = os.environ.get("FIREBASE_STORAGE_BUCKET", "motor-f8005.firebasestorage.app")
+POOL_SIZE = 5  # keep-alive connections; matches the simulator's concurrent chunk writers
+
+
+@functools.lru_cache(maxsize=None)
+def app() -> firebase_admin.App:
+    """The default firebase_admin App, with a pooled keep-alive session mounted on first use."""
+    if firebase_admin._apps:
+        fb_app = firebase_admin.get_app()
+    else:
+        cred_path = find_cred_path()
+        if not cred_path:
+            print("ERROR: Firebase credentials not found. Put your key JSON in motor_backend folder.")
+            print("Tried:", CRED_PATHS)
+            print("Or use any .json file whose name contains 'firebase' and 'adminsdk'.")
+            raise SystemExit(1)
+        fb_app = firebase_admin.initialize_app(credentials.Certificate(cred_path), {
+            "databaseURL": DATABASE_URL + "/",
+            "storageBucket": STORAGE_BUCKET,
+        })
+
+    # Keep-alive pool on the SDK's AuthorizedSession so every set/update/delete reuses sockets
+    db.reference(app=fb_app)._client.session.mount("https://", HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=POOL_SIZE,
+        pool_block=False,
+        # raise_on_status=False returns the last 5xx response (like the SDK's own retry config)
+        # instead of raising a bare RetryError, so the SDK's error mapping still applies
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                          allowed_methods=None, raise_on_status=False),
+    ))
+    return fb_app
+
+
+def ref(path: str = "/") -> db.Reference:
+    return db.reference(path, app=app())
+
+
+def live_ref() -> db.Reference:
+    return ref("motor01/live_reading")
+
+
+def logs_ref() -> db.Reference:
+    return ref("motor01/logs")
+
+
+def session():
+    """The SDK's authorized requests session (for raw REST calls on the shared pool)."""
+    return ref()._client.session
+
+
+# OAuth token for REST calls outside the SDK; refreshed a few minutes before it expires
+_token = None
+
+
+def access_token() -> str:
+    global _token
+    # google-auth expiry is naive UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if _token is None or _token.expiry - now < timedelta(minutes=5):
+        _token = app().credential.get_access_token()
+    return _token.access_token
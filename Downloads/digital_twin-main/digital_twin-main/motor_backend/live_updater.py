@@ -3,78 +3,64 @@ Real-time Motor Data Updater
 - Infinite loop: generates data indefinitely
 - Live updates: motor01/live_reading with latest values for real-time dashboard
 - Logs: motor01/logs/entry_01, entry_02, entry_03... (incrementing, one per cycle)
+- Ring buffer: only the latest RING_SIZE log entries are kept; older ones are deleted in the same write
 - Timing: new value every 5 seconds (small gradual changes)
 - Data: centered around realistic ranges (I: ~72A, V: ~400V, T: ~55°C, etc.) with tiny deltas
 - Startup: clears old logs before beginning
+- Writes: asyncio + aiohttp PATCH to the RTDB REST endpoint. A generator coroutine feeds a bounded queue;
+  a single writer drains it, so entries that pile up during a Firebase hiccup go out as one batched PATCH
 
 Run: python live_updater.py
+Debug: MOTOR_DEBUG_PROBE=1 python live_updater.py  (also runs the motor01/_test write/read/delete check)
 """
-import firebase_admin
-from firebase_admin import credentials, db
+import aiohttp
+import array
+import asyncio
 import random
 import time
 import os
 from datetime import datetime
 import math
 
-# Resolve credential path (works with any filename you gave the key)
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-CRED_PATHS = [
-    os.path.join(SCRIPT_DIR, "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
-    os.path.join(SCRIPT_DIR, "motor-f8005-firebase-adminsdk-fbsvc-b789b512df.json"),
-    os.path.join(os.path.dirname(SCRIPT_DIR), "motor_backend", "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
-    os.path.join(os.getcwd(), "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
-]
-CRED_PATH = None
-for p in CRED_PATHS:
-    if os.path.exists(p):
-        CRED_PATH = p
-        break
-# If you renamed the key file, we look for any *firebase*adminsdk*.json in motor_backend
-if not CRED_PATH and os.path.isdir(SCRIPT_DIR):
-    for f in os.listdir(SCRIPT_DIR):
-        if f.endswith(".json") and "firebase" in f.lower() and "adminsdk" in f.lower():
-            CRED_PATH = os.path.join(SCRIPT_DIR, f)
-            break
-if not CRED_PATH:
-    print("ERROR: Firebase credentials not found. Put your key JSON in motor_backend folder.")
-    print("Tried:", CRED_PATHS)
-    print("Or use any .json file whose name contains 'firebase' and 'adminsdk'.")
-    raise SystemExit(1)
-
-if not firebase_admin._apps:
-    cred = credentials.Certificate(CRED_PATH)
-    firebase_admin.initialize_app(cred, {
-        "databaseURL": "https://motor-f8005-default-rtdb.asia-southeast1.firebasedatabase.app/"
-    })
+import fb
+from _sample import Sample, live_reading
 
-print("Connected to Firebase")
-print("Database: https://motor-f8005-default-rtdb.asia-southeast1.firebasedatabase.app/")
+SIN_TABLE_SIZE = 1024  # power of two so phase wraps with a mask
+SIN_TABLE = array.array("d", (math.sin(2 * math.pi * k / SIN_TABLE_SIZE) for k in range(SIN_TABLE_SIZE)))
+CYCLE_SECONDS = 5.0  # one entry per cycle, on a fixed monotonic schedule
+RING_SIZE = 500  # log entries kept in motor01/logs (dashboard shows at most 500)
+WRITE_QUEUE_SIZE = 64  # entries buffered while writes are slow; generator waits when full
+WRITE_BATCH_MAX = 16  # entries coalesced into one PATCH
 
-# Verify write works
-try:
-    test_ref = db.reference("motor01/_test")
-    test_ref.set({"ping": datetime.now().isoformat()})
-    result = test_ref.get()
-    if result:
-        print("Write test: OK")
-    test_ref.delete()
-except Exception as e:
-    print("ERROR - Write test failed:", e)
-    print("Check: 1) Firebase rules, 2) Service account has Editor role, 3) Database URL is correct")
-    raise SystemExit(1)
+# Initializes the shared app, then primes TLS + auth token once so the first real write doesn't pay for it
+fb.live_ref().get(shallow=True)
+
+print("Connected to Firebase")
+print("Database:", fb.DATABASE_URL + "/")
+
+# Verify write works (3 round-trips, so only when MOTOR_DEBUG_PROBE=1)
+if os.environ.get("MOTOR_DEBUG_PROBE") == "1":
+    try:
+        test_ref = fb.ref("motor01/_test")
+        test_ref.set({"ping": datetime.now().isoformat()})
+        result = test_ref.get()
+        if result:
+            print("Write test: OK")
+        test_ref.delete()
+    except Exception as e:
+        print("ERROR - Write test failed:", e)
+        print("Check: 1) Firebase rules, 2) Service account has Editor role, 3) Database URL is correct")
+        raise SystemExit(1)
 
 # Clear old logs
-logs_ref = db.reference("motor01/logs")
-logs_ref.delete()
+fb.logs_ref().delete()
 print("Cleared old logs")
 
-print("Generating data every 5 seconds (Ctrl+C to stop)")
+print(f"Generating data every {CYCLE_SECONDS:g} seconds (Ctrl+C to stop)")
 print("  - motor01/live_reading: latest values for dashboard")
 print("  - motor01/logs: entry_01, entry_02, entry_03... (incrementing)")
 print()
 
-live_ref = db.reference("motor01/live_reading")
 entry_counter = 0
 
 # Stateful baselines so har step pe sirf chhota +/‑ change aaye (random walk style)
@@ -91,23 +77,19 @@ last_T2 = 50.0
 last_vib = 2.1
 
 
-def _step(value: float, low: float, high: float, max_delta: float) -> float:
-    """Chhota random step within [low, high], clamp + soft bounce at edges."""
-    delta = random.uniform(-max_delta, max_delta)
-    value += delta
-    if value < low:
-        value = low + (low - value) * 0.3
-    if value > high:
-        value = high - (value - high) * 0.3
-    return round(value, 2)
+# Default args below pre-bind globals/attributes as fast locals (LOAD_FAST vs LOAD_GLOBAL + attr lookup)
+def _step(value: float, low: float, high: float, max_delta: float, _uniform=random.uniform) -> float:
+    """Chhota random step within [low, high], clamped at the edges."""
+    return round(max(low, min(high, value + _uniform(-max_delta, max_delta))), 2)
 
 
-def generate_log_entry(entry_index: int):
+def generate_log_entry(entry_index: int, _step=_step, _uniform=random.uniform,
+                       _time_ns=time.time_ns, _sin_table=SIN_TABLE):
     global last_I1, last_I2, last_I3
     global last_V1, last_V2, last_V3
     global last_freq, last_pf, last_T1, last_T2, last_vib
 
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ts = _time_ns() // 1_000_000_000  # unix seconds
 
     # Even smaller, more subtle random walks around baselines
     last_I1 = _step(last_I1, 60.0, 90.0, 0.25)
@@ -119,59 +101,98 @@ def generate_log_entry(entry_index: int):
     last_V3 = _step(last_V3, 395.0, 410.0, 0.3)
 
     last_freq = _step(last_freq, 49.8, 50.2, 0.005)
-    last_pf = round(max(0.83, min(0.96, last_pf + random.uniform(-0.002, 0.002))), 3)
+    last_pf = round(max(0.83, min(0.96, last_pf + _uniform(-0.002, 0.002))), 3)
 
     last_T1 = _step(last_T1, 45.0, 75.0, 0.2)
     last_T2 = _step(last_T2, 40.0, 65.0, 0.2)
 
     # Vibration: sine shape + very small random walk for realistic but gentle waveform
+    # sin(2*pi*f*t) via SIN_TABLE: phase in table steps, wrapped with & (size - 1)
     t = entry_index / 40.0
-    slow = math.sin(2 * math.pi * 0.06 * t)
-    mid = math.sin(2 * math.pi * 0.32 * t)
+    slow = _sin_table[int(0.06 * t * SIN_TABLE_SIZE) & (SIN_TABLE_SIZE - 1)]
+    mid = _sin_table[int(0.32 * t * SIN_TABLE_SIZE) & (SIN_TABLE_SIZE - 1)]
     base_vib = 2.0 + 0.35 * slow + 0.2 * mid
     last_vib = _step(base_vib, 1.2, 3.0, 0.04)
     vibration = last_vib
 
-    return {
-        "I1": last_I1,
-        "I2": last_I2,
-        "I3": last_I3,
-        "V1": last_V1,
-        "V2": last_V2,
-        "V3": last_V3,
-        "frequency": last_freq,
-        "pf": last_pf,
-        "T1": last_T1,
-        "T2": last_T2,
-        "vibration": vibration,
-        "timestamp": ts,
-    }
+    return Sample(last_I1, last_I2, last_I3, last_V1, last_V2, last_V3,
+                  last_freq, last_pf, last_T1, last_T2, vibration, ts)
 
-try:
+
+async def produce(queue: asyncio.Queue):
+    """Generate one entry per cycle; blocks (backpressure) while the write queue is full.
+
+    Ticks are scheduled on time.monotonic() so the cadence doesn't drift by the time
+    spent in each cycle; ticks that are already overdue are skipped, not queued up.
+    """
+    global entry_counter
+    next_tick = time.monotonic()
+    while True:
+        sample = generate_log_entry(entry_counter)
+        entry_counter += 1
+        await queue.put((entry_counter, sample))
+
+        # Har 5 second me chhota, gradual update
+        next_tick += CYCLE_SECONDS
+        sleep_for = next_tick - time.monotonic()
+        if sleep_for < 0:
+            skipped = int(-sleep_for // CYCLE_SECONDS) + 1
+            print(f"WARNING: {-sleep_for:.1f}s behind schedule, skipping {skipped} sample(s)")
+            next_tick += skipped * CYCLE_SECONDS
+            sleep_for = next_tick - time.monotonic()
+        await asyncio.sleep(sleep_for)
+
+
+async def write(session: aiohttp.ClientSession, queue: asyncio.Queue):
+    """Single writer: everything queued goes out as one multi-path PATCH to motor01.
+
+    A failed batch is kept and retried together with whatever queued up meanwhile.
+    """
+    batch = []
     while True:
+        if not batch:
+            batch.append(await queue.get())
+        while not queue.empty() and len(batch) < WRITE_BATCH_MAX:
+            batch.append(queue.get_nowait())
+
+        body = {"live_reading": live_reading(batch[-1][1])}
+        for entry_no, sample in batch:
+            body[f"logs/entry_{entry_no:02d}"] = sample._asdict()
+            if entry_no > RING_SIZE:
+                # null in a multi-path update deletes that path
+                body[f"logs/entry_{entry_no - RING_SIZE:02d}"] = None
+
         try:
-            flat = generate_log_entry(entry_counter)
-            ts = flat["timestamp"]
-
-            # 1. Update live_reading (latest values for real-time dashboard)
-            payload = {
-                "current": {"I1": flat["I1"], "I2": flat["I2"], "I3": flat["I3"]},
-                "voltage": {"V1": flat["V1"], "V2": flat["V2"], "V3": flat["V3"]},
-                "temperature": {"T1": flat["T1"], "T2": flat["T2"]},
-                "frequency": flat["frequency"],
-                "vibration": flat["vibration"],
-                "timestamp": ts,
-            }
-            live_ref.set(payload)
-
-            # 2. Add new log entry with incrementing number
-            entry_counter += 1
-            logs_ref.update({f"entry_{entry_counter:02d}": flat})
-
-            print(f"Updated at {ts} | live_reading ✓ | logs/entry_{entry_counter:02d} ✓")
+            # Token refresh is a blocking HTTP call; keep it off the event loop
+            token = await asyncio.to_thread(fb.access_token)
+            async with session.patch(
+                f"{fb.DATABASE_URL}/motor01.json",
+                json=body,
+                # Token in a header, not the query string, so it never shows up in error messages
+                headers={"Authorization": f"Bearer {token}"},
+                params={"print": "silent"},
+            ) as resp:
+                resp.raise_for_status()
         except Exception as e:
-            print(f"ERROR writing to Firebase: {e}")
-        # Har 5 second me chhota, gradual update
-        time.sleep(5)
+            print(f"ERROR writing to Firebase ({len(batch)} queued entries kept): {e}")
+            await asyncio.sleep(1)
+            continue
+
+        first, last = batch[0][0], batch[-1][0]
+        logs = f"logs/entry_{last:02d}" if first == last else f"logs/entry_{first:02d}..entry_{last:02d}"
+        print(f"Updated at {batch[-1][1].timestamp} | live_reading ✓ | {logs} ✓")
+        batch = []
+
+
+async def run():
+    queue = asyncio.Queue(maxsize=WRITE_QUEUE_SIZE)
+    connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await asyncio.gather(produce(queue), write(session, queue))
+
+
+try:
+    asyncio.run(run())
 except KeyboardInterrupt:
     print("\nStopped.")
@@ -1,145 +1,195 @@
 import os
-import math
-import random
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from itertools import islice
+
+import numpy as np
+import orjson
+
+try:
+    # Optional: JIT-compiles _signals for very large num_points (pip install numba)
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+import fb
+from _sample import FIELDS, Sample, live_reading
 
-import firebase_admin
-from firebase_admin import credentials, db
-
-
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# Try to find the Firebase service account JSON in a flexible way
-CRED_PATHS = [
-    os.path.join(SCRIPT_DIR, "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
-    os.path.join(SCRIPT_DIR, "motor-f8005-firebase-adminsdk-fbsvc-b789b512df.json"),
-    os.path.join(os.path.dirname(SCRIPT_DIR), "motor_backend", "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
-    os.path.join(os.getcwd(), "motor-f8005-firebase-adminsdk-fbsvc-b789b512df (2).json"),
-]
-
-CRED_PATH = None
-for p in CRED_PATHS:
-    if os.path.exists(p):
-        CRED_PATH = p
-        break
-
-if not CRED_PATH and os.path.isdir(SCRIPT_DIR):
-    for f in os.listdir(SCRIPT_DIR):
-        name = f.lower()
-        if f.endswith(".json") and "firebase" in name and "adminsdk" in name:
-            CRED_PATH = os.path.join(SCRIPT_DIR, f)
-            break
-
-if not CRED_PATH:
-    print("ERROR: Firebase credentials not found. Put your key JSON in motor_backend folder.")
-    print("Filename should contain 'firebase' and 'adminsdk'.")
-    raise SystemExit(1)
-
-if not firebase_admin._apps:
-    cred = credentials.Certificate(CRED_PATH)
-    firebase_admin.initialize_app(
-        cred,
-        {
-            "databaseURL": "https://motor-f8005-default-rtdb.asia-southeast1.firebasedatabase.app/"
-        },
-    )
+
+CHUNK_SIZE = 100  # log entries per PATCH
+WRITE_WORKERS = fb.POOL_SIZE  # chunks written concurrently, one pooled connection each
+# "aos": one dict per sample under motor01/logs (what the dashboard reads)
+# "soa": one array per field under motor01/logs_soa (no repeated keys on the wire)
+# "mpk": the soa arrays as one MessagePack blob in Firebase Storage, pointer at motor01/bulk_ref
+LOGS_LAYOUT = os.environ.get("MOTOR_LOGS_LAYOUT", "aos")
+
+fb.app()
 
 print("✅ Connected to Firebase")
-print("Simulating 500 realistic motor samples into motor01/logs ...")
+print(f"Simulating 500 realistic motor samples ({LOGS_LAYOUT} layout) ...")
 
 
-def simulate_series(num_points: int = 500):
-    """Generate a realistic-looking time series for a 3-phase induction motor."""
-    logs = {}
+@njit(parallel=True, fastmath=True, cache=True)
+def _signals(noise, spike_draw, spike_amps):
+    """All signal math for n samples, as whole-array expressions.
 
-    # Start history a bit in the past so timestamps look natural
-    start_time = datetime.now() - timedelta(seconds=num_points * 10)
+    noise holds one N(0, 1) row per signal, in FIELDS order. Returns a
+    (len(FIELDS), n) array, rows in FIELDS order.
+    """
+    n = spike_draw.shape[0]
 
     base_current = 70.0  # A
     base_voltage = 400.0  # V
 
-    for i in range(1, num_points + 1):
-        t_norm = i / num_points  # 0 → 1 over whole run
+    # Every signal is computed for all samples at once as a length-n array
+    i = np.arange(1, n + 1)
+    t_norm = i / n  # 0 → 1 over whole run
+
+    # Warm‑up over first 80–100 points
+    warmup = np.minimum(1.0, i / 100.0)
+
+    # Load oscillation over time (motor load going up/down)
+    load_wave = 0.8 + 0.4 * np.sin(2 * np.pi * t_norm * 3.0)
 
-        # Warm‑up over first 80–100 points
-        warmup = min(1.0, i / 100.0)
+    # Simulated slow degradation after ~70% of history
+    degradation = 1.0 + 0.3 * np.maximum(0.0, t_norm - 0.7)
 
-        # Load oscillation over time (motor load going up/down)
-        load_wave = 0.8 + 0.4 * math.sin(2 * math.pi * t_norm * 3.0)
+    out = np.empty((noise.shape[0], n))
 
-        # Simulated slow degradation after ~70% of history
-        degradation = 1.0 + 0.3 * max(0.0, t_norm - 0.7)
+    # Phase currents with slight unbalance and noise
+    out[0] = base_current * load_wave * (1.00 + 0.03 * noise[0]) * degradation
+    out[1] = base_current * 1.03 * load_wave * (1.00 + 0.03 * noise[1]) * degradation
+    out[2] = base_current * 0.97 * load_wave * (1.00 + 0.03 * noise[2]) * degradation
 
-        # Phase currents with slight unbalance and noise
-        I1 = base_current * load_wave * random.gauss(1.00, 0.03) * degradation
-        I2 = base_current * 1.03 * load_wave * random.gauss(1.00, 0.03) * degradation
-        I3 = base_current * 0.97 * load_wave * random.gauss(1.00, 0.03) * degradation
+    # Line voltages with small ripple and noise
+    volt_ripple = 0.01 * np.sin(2 * np.pi * t_norm * 5.0)
+    out[3] = base_voltage * (1.0 + volt_ripple) + 2.0 * noise[3]
+    out[4] = base_voltage * (1.0 - volt_ripple / 2.0) + 2.0 * noise[4]
+    out[5] = base_voltage * (1.0 + volt_ripple / 3.0) + 2.0 * noise[5]
 
-        # Line voltages with small ripple and noise
-        volt_ripple = 0.01 * math.sin(2 * math.pi * t_norm * 5.0)
-        V1 = base_voltage * (1.0 + volt_ripple) + random.gauss(0.0, 2.0)
-        V2 = base_voltage * (1.0 - volt_ripple / 2.0) + random.gauss(0.0, 2.0)
-        V3 = base_voltage * (1.0 + volt_ripple / 3.0) + random.gauss(0.0, 2.0)
+    # Frequency very close to 50 Hz with tiny variation
+    out[6] = 50.0 + 0.05 * noise[6]
 
-        # Frequency very close to 50 Hz with tiny variation
-        frequency = 50.0 + random.gauss(0.0, 0.05)
+    # Power factor slightly degrading as load and vibration increase
+    pf_base = 0.94 - 0.04 * (1.0 - load_wave)
+    out[7] = np.clip(pf_base - 0.05 * (degradation - 1.0) + 0.01 * noise[7], 0.75, 0.98)
 
-        # Power factor slightly degrading as load and vibration increase
-        pf_base = 0.94 - 0.04 * (1.0 - load_wave)
-        pf = pf_base - 0.05 * (degradation - 1.0) + random.gauss(0.0, 0.01)
-        pf = max(0.75, min(0.98, pf))
+    # Temperature: ramp up during warm‑up, then slightly increase with degradation
+    out[8] = 35.0 + 45.0 * warmup + 8.0 * (degradation - 1.0) + noise[8]
+    out[9] = out[8] - 4.0 + noise[9]
 
-        # Temperature: ramp up during warm‑up, then slightly increase with degradation
-        T1 = 35.0 + 45.0 * warmup + 8.0 * (degradation - 1.0) + random.gauss(0.0, 1.0)
-        T2 = T1 - 4.0 + random.gauss(0.0, 1.0)
+    # Vibration: grows with load and degradation, plus rare spikes (bearing issue)
+    vib_base = 1.5 + 0.8 * load_wave + 4.0 * (degradation - 1.0)
+    spikes = (i > int(n * 0.7)) & (spike_draw < 0.05)
+    out[10] = vib_base + 0.2 * noise[10] + np.where(spikes, spike_amps, 0.0)
 
-        # Vibration: grows with load and degradation, plus rare spikes (bearing issue)
-        vib_base = 1.5 + 0.8 * load_wave + 4.0 * (degradation - 1.0)
-        vibration = vib_base + random.gauss(0.0, 0.2)
-        if i > int(num_points * 0.7) and random.random() < 0.05:
-            vibration += random.uniform(1.0, 2.5)
+    return out
 
-        ts = (start_time + timedelta(seconds=i * 10)).strftime("%Y-%m-%d %H:%M:%S")
 
-        logs[f"entry_{i:03}"] = {
-            "I1": round(I1, 2),
-            "I2": round(I2, 2),
-            "I3": round(I3, 2),
-            "V1": round(V1, 2),
-            "V2": round(V2, 2),
-            "V3": round(V3, 2),
-            "frequency": round(frequency, 2),
-            "pf": round(pf, 2),
-            "T1": round(T1, 2),
-            "T2": round(T2, 2),
-            "vibration": round(vibration, 2),
-            "timestamp": ts,
-        }
+def simulate_soa(num_points: int = 500):
+    """Generate a realistic-looking time series for a 3-phase induction motor.
 
-    return logs
+    Returns one list per field in FIELDS plus "timestamps" (structure-of-arrays).
+    """
+    n = num_points
+    rng = np.random.default_rng()
 
+    # All Gaussian noise drawn in one call: one contiguous row of N(0, 1) per signal
+    noise = rng.standard_normal((len(FIELDS), n))
+    spike_draw = rng.random(n)
+    spike_amps = rng.uniform(1.0, 2.5, n)
 
-logs_ref = db.reference("motor01/logs")
-logs = simulate_series(500)
+    # Start history a bit in the past so timestamps look natural (unix seconds)
+    start_epoch = int((datetime.now() - timedelta(seconds=num_points * 10)).timestamp())
 
-logs_ref.set(logs)
-print(f"🎯 Wrote {len(logs)} log entries to motor01/logs (entry_001 → entry_{len(logs):03})")
+    # Rounded outside the kernel (NumPy's round is exact to 2 decimals); plain lists serialize directly
+    soa = dict(zip(FIELDS, np.round(_signals(noise, spike_draw, spike_amps), 2).tolist()))
+    soa["timestamps"] = list(range(start_epoch + 10, start_epoch + 10 * n + 1, 10))
+    return soa
+
+
+def simulate_series(num_points: int = 500, _sample=Sample):
+    """Same series as simulate_soa, as a list of Sample rows."""
+    soa = simulate_soa(num_points)
+    rows = zip(*(soa[field] for field in FIELDS), soa["timestamps"])
+    return [_sample(*row) for row in rows]
+
+
+def _chunks(logs: dict, size: int):
+    it = iter(logs.items())
+    while chunk := dict(islice(it, size)):
+        yield chunk
+
+
+def _send(session, method: str, url: str, body: bytes):
+    resp = session.request(
+        method,
+        url,
+        data=body,
+        headers={"Content-Type": "application/json"},
+        params={"print": "silent"},
+        timeout=60,
+    )
+    resp.raise_for_status()
+
+
+def write_logs(path: str, logs: dict):
+    """Replace everything under path with logs, PATCHed in CHUNK_SIZE batches concurrently.
+
+    path is cleared first so stale keys (e.g. live_updater's ring-buffer entries) don't
+    survive the merge. Failed chunks are retried once. Chunks are serialized once with
+    orjson and sent as raw bodies through the SDK's authorized session, skipping the
+    SDK's own json.dumps.
+    """
+    session = fb.session()
+    url = f"{fb.DATABASE_URL}/{path}.json"
+    bodies = [orjson.dumps(chunk) for chunk in _chunks(logs, CHUNK_SIZE)]
+    _send(session, "delete", url, None)
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as pool:
+        for _ in range(2):
+            futures = {pool.submit(_send, session, "patch", url, body): body for body in bodies}
+            wait(futures)
+            bodies = [body for fut, body in futures.items() if fut.exception()]
+            if not bodies:
+                return
+    raise RuntimeError(f"{len(bodies)} log chunk(s) failed to write after retry")
+
+
+if LOGS_LAYOUT == "soa":
+    soa = simulate_soa(500)
+    _send(fb.session(), "put", f"{fb.DATABASE_URL}/motor01/logs_soa.json", orjson.dumps(soa))
+    print(f"🎯 Wrote {len(soa['timestamps'])} samples to motor01/logs_soa")
+
+    latest = Sample(*(soa[field][-1] for field in FIELDS), soa["timestamps"][-1])
+elif LOGS_LAYOUT == "mpk":
+    import msgpack
+    from firebase_admin import storage
+
+    soa = simulate_soa(500)
+    blob = storage.bucket(app=fb.app()).blob(f"motor01/bulk_{soa['timestamps'][-1]}.mpk")
+    # Signals are already rounded to 2 decimals: integer hundredths are lossless and pack smaller than floats
+    packed = {field: [round(v * 100) for v in soa[field]] for field in FIELDS}
+    packed["timestamps"] = soa["timestamps"]
+    packed["scale"] = 100
+    blob.upload_from_string(msgpack.packb(packed), content_type="application/x-msgpack")
+    bulk_ref = f"gs://{blob.bucket.name}/{blob.name}"
+    fb.ref("motor01/bulk_ref").set(bulk_ref)
+    print(f"🎯 Uploaded {len(soa['timestamps'])} samples to {bulk_ref} (pointer in motor01/bulk_ref)")
+
+    latest = Sample(*(soa[field][-1] for field in FIELDS), soa["timestamps"][-1])
+else:
+    samples = simulate_series(500)
+    # Dicts only at the JSON boundary
+    logs = {f"entry_{i:03}": s._asdict() for i, s in enumerate(samples, start=1)}
+
+    write_logs("motor01/logs", logs)
+    print(f"🎯 Wrote {len(logs)} log entries to motor01/logs (entry_001 → entry_{len(logs):03})")
+
+    latest = samples[-1]
 
 # Also update live_reading with the latest point so gauges show consistent values
-latest_key = f"entry_{len(logs):03}"
-latest = logs[latest_key]
-
-live_ref = db.reference("motor01/live_reading")
-live_ref.set(
-    {
-        "current": {"I1": latest["I1"], "I2": latest["I2"], "I3": latest["I3"]},
-        "voltage": {"V1": latest["V1"], "V2": latest["V2"], "V3": latest["V3"]},
-        "temperature": {"T1": latest["T1"], "T2": latest["T2"]},
-        "frequency": latest["frequency"],
-        "vibration": latest["vibration"],
-        "timestamp": latest["timestamp"],
-    }
-)
+fb.live_ref().set(live_reading(latest))
 
 print("✅ live_reading updated with latest simulated values")
 